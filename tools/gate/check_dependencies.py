@@ -15,7 +15,10 @@ try:
         DEFAULT_BANK_PATH,
         DEFAULT_FORMS_MAP_PATH,
         DEFAULT_KITS_PATH,
+        BankIndex,
         build_form_to_kits,
+        first_bank_entry,
+        iter_lesson_files,
         iter_spanish_locations,
         load_always_allow,
         load_bank,
@@ -32,7 +35,10 @@ except ImportError:  # pragma: no cover - allow running as a script
         DEFAULT_BANK_PATH,
         DEFAULT_FORMS_MAP_PATH,
         DEFAULT_KITS_PATH,
+        BankIndex,
         build_form_to_kits,
+        first_bank_entry,
+        iter_lesson_files,
         iter_spanish_locations,
         load_always_allow,
         load_bank,
@@ -44,7 +50,7 @@ except ImportError:  # pragma: no cover - allow running as a script
     )
 
 
-def collect_lesson_forms(lesson: object, bank: Dict[str, list], forms_map: Dict[str, bool]) -> Dict[str, set[str]]:
+def collect_lesson_forms(lesson: object, bank: BankIndex, forms_map: Dict[str, bool]) -> Dict[str, set[str]]:
     used: Dict[str, set[str]] = {}
     for location in iter_spanish_locations(lesson):
         for token, _, _ in tokenize(location.text):
@@ -110,12 +116,12 @@ def main(argv: Iterable[str] | None = None) -> int:
     form_to_kits = build_form_to_kits(kits)
     _, always_allow_norm = load_always_allow(args.always_allow, forms_map)
 
-    prior_forms: set[str] = set()
+    prior_set: set[str] = set()
     if args.prior:
-        prior_forms = load_progress(args.prior, kits, forms_map)
-    prior_forms.update(always_allow_norm)
+        prior_set = load_progress(args.prior, kits, forms_map)
+    prior_forms = frozenset(prior_set | always_allow_norm)
 
-    lesson_files = sorted([p for p in scan_dir.rglob("*.json") if p.is_file()])
+    lesson_files = list(iter_lesson_files(scan_dir))
     if not lesson_files:
         print(f"[gate-check] No lesson JSON files found under {scan_dir}", file=sys.stderr)
         return 0
@@ -156,7 +162,7 @@ def main(argv: Iterable[str] | None = None) -> int:
         for path, missing_forms in failures.items():
             print(f"- {path}:", file=sys.stderr)
             for normalized, surfaces in sorted(missing_forms.items()):
-                entry = bank.get(normalized, [None])[0]
+                entry = first_bank_entry(bank, normalized)
                 english = ""
                 lemma = ""
                 if entry:
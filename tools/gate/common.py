@@ -4,8 +4,11 @@ from __future__ import annotations
 
 import csv
 import json
+import os
+import re
 import unicodedata
 from dataclasses import dataclass
+from functools import lru_cache
 from pathlib import Path
 from typing import Any, Dict, Iterator, List, MutableMapping, MutableSequence, Optional, Tuple, Union
 
@@ -16,6 +19,14 @@ DEFAULT_KITS_PATH = ROOT / "vocab" / "kits.csv"
 DEFAULT_ALWAYS_ALLOW_PATH = CONFIG_DIR / "always_allow.json"
 DEFAULT_FORMS_MAP_PATH = CONFIG_DIR / "forms_map.json"
 
+# common punctuation stripped from around tokens by normalize_form
+_STRIP_PUNCT = "\"'`¡!¿?.,:;()[]{}<>«»—-·…“”"
+# \w matches exactly str.isalnum() or "_", \s exactly str.isspace()
+_TOKEN_RE = re.compile(r"\w+|\S")
+
+_BANK_COLUMNS = ("form", "lemma", "pos", "features", "level", "english")
+_KIT_COLUMNS = ("kit_id", "unlocks_forms", "notes")
+
 
 @dataclass
 class BankEntry:
@@ -27,6 +38,9 @@ class BankEntry:
     english: str
 
 
+BankIndex = Dict[str, Union[BankEntry, List[BankEntry]]]
+
+
 @dataclass
 class Kit:
     kit_id: str
@@ -67,35 +81,50 @@ def normalize_form(text: Optional[str], config: Dict[str, bool]) -> str:
     if config.get("normalize", True):
         value = unicodedata.normalize("NFC", value)
     if config.get("strip_punct", True):
-        # strip common punctuation used around tokens
-        value = value.strip("\"'`¡!¿?.,:;()[]{}<>«»—-·…“”")
+        value = value.strip(_STRIP_PUNCT)
     value = value.strip()
     if config.get("lower", True):
         value = value.lower()
     return value
 
 
-def load_bank(path: Optional[Union[str, Path]], config: Dict[str, bool]) -> Dict[str, List[BankEntry]]:
-    csv_path = Path(path) if path else DEFAULT_BANK_PATH
-    entries: Dict[str, List[BankEntry]] = {}
-    with open(csv_path, newline="", encoding="utf-8") as handle:
-        reader = csv.DictReader(handle)
+def iter_csv_columns(path: Union[str, Path], columns: Tuple[str, ...]) -> Iterator[Tuple[str, ...]]:
+    # csv.reader plus fixed column positions avoids building a dict per row
+    with open(path, newline="", encoding="utf-8") as handle:
+        reader = csv.reader(handle)
+        header = next(reader, [])
+        positions = [header.index(column) if column in header else None for column in columns]
         for row in reader:
-            form = row.get("form", "").strip()
-            if not form:
-                continue
-            normalized = normalize_form(form, config)
-            if not normalized:
-                continue
-            entry = BankEntry(
-                form=form,
-                lemma=row.get("lemma", ""),
-                pos=row.get("pos", ""),
-                features=row.get("features", ""),
-                level=row.get("level", ""),
-                english=row.get("english", ""),
-            )
-            entries.setdefault(normalized, []).append(entry)
+            width = len(row)
+            yield tuple(row[pos] if pos is not None and pos < width else "" for pos in positions)
+
+
+def load_bank(path: Optional[Union[str, Path]], config: Dict[str, bool]) -> BankIndex:
+    csv_path = Path(path) if path else DEFAULT_BANK_PATH
+    entries: BankIndex = {}
+    for form, lemma, pos, features, level, english in iter_csv_columns(csv_path, _BANK_COLUMNS):
+        form = form.strip()
+        if not form:
+            continue
+        normalized = normalize_form(form, config)
+        if not normalized:
+            continue
+        entry = BankEntry(form=form, lemma=lemma, pos=pos, features=features, level=level, english=english)
+        # most forms have a single entry; only homographs get a list
+        existing = entries.get(normalized)
+        if existing is None:
+            entries[normalized] = entry
+        elif isinstance(existing, list):
+            existing.append(entry)
+        else:
+            entries[normalized] = [existing, entry]
+    return entries
+
+
+def first_bank_entry(bank: BankIndex, normalized: str) -> Optional[BankEntry]:
+    entries = bank.get(normalized)
+    if isinstance(entries, list):
+        return entries[0]
     return entries
 
 
@@ -104,17 +133,13 @@ def load_kits(path: Optional[Union[str, Path]], config: Dict[str, bool]) -> Dict
     kits: Dict[str, Kit] = {}
     if not csv_path.exists():
         return kits
-    with open(csv_path, newline="", encoding="utf-8") as handle:
-        reader = csv.DictReader(handle)
-        for row in reader:
-            kit_id = row.get("kit_id", "").strip()
-            if not kit_id:
-                continue
-            forms_field = row.get("unlocks_forms", "")
-            notes = row.get("notes", "").strip()
-            raw_forms = [f.strip() for f in forms_field.split("|") if f.strip()]
-            normalized_forms = [normalize_form(form, config) for form in raw_forms if normalize_form(form, config)]
-            kits[kit_id] = Kit(kit_id=kit_id, forms=raw_forms, normalized_forms=normalized_forms, notes=notes)
+    for kit_id, forms_field, notes in iter_csv_columns(csv_path, _KIT_COLUMNS):
+        kit_id = kit_id.strip()
+        if not kit_id:
+            continue
+        raw_forms = [f.strip() for f in forms_field.split("|") if f.strip()]
+        normalized_forms = [normalize_form(form, config) for form in raw_forms if normalize_form(form, config)]
+        kits[kit_id] = Kit(kit_id=kit_id, forms=raw_forms, normalized_forms=normalized_forms, notes=notes.strip())
     return kits
 
 
@@ -159,10 +184,40 @@ def build_form_to_kits(kits: Dict[str, Kit]) -> Dict[str, List[str]]:
     return mapping
 
 
+def iter_lesson_files(root: Union[str, Path]) -> Iterator[Path]:
+    # os.scandir walk in the same order as sorted(root.rglob("*.json")); plain
+    # strings on the stack are directories still to expand, Paths are results
+    stack: List[Union[str, Path]] = [os.fspath(root)]
+    while stack:
+        item = stack.pop()
+        if isinstance(item, Path):
+            yield item
+            continue
+        try:
+            with os.scandir(item) as it:
+                entries = sorted(it, key=lambda entry: entry.name)
+        except OSError:
+            # like pathlib's selector: a root that is not a directory, or an
+            # unreadable subdirectory, simply contributes no files
+            continue
+        pending: List[Union[str, Path]] = []
+        for entry in entries:
+            if entry.is_dir(follow_symlinks=False):
+                pending.append(entry.path)
+            elif entry.name.endswith(".json") and entry.is_file():
+                pending.append(Path(entry.path))
+        stack.extend(reversed(pending))
+
+
 def is_spanish_key(key: Optional[Union[str, int]]) -> bool:
     if key is None:
         return False
-    key_str = str(key).lower()
+    return _is_spanish_key_str(str(key).lower())
+
+
+@lru_cache(maxsize=4096)
+def _is_spanish_key_str(key_str: str) -> bool:
+    # lessons reuse a small set of keys, so this is almost always a cache hit
     if not key_str:
         return False
     if key_str in {"es", "spanish", "spanish_line", "spanish_text", "spanish_sentence"}:
@@ -211,53 +266,47 @@ def should_gate_list(key: Union[str, int], context: Dict[str, Any]) -> bool:
 
 
 def iter_spanish_locations(obj: Any, path: Tuple[Any, ...] = (), context: Optional[Dict[str, Any]] = None) -> Iterator[GateLocation]:
-    if isinstance(obj, MutableMapping):
-        new_context = update_context(context, obj)
-        for key, value in obj.items():
-            new_path = path + (key,)
-            if isinstance(value, str):
-                if should_gate_field(key, new_context):
-                    yield GateLocation(container=obj, key=key, text=value, path=new_path)
-            elif isinstance(value, MutableSequence):
-                if should_gate_list(key, new_context):
-                    for idx, item in enumerate(value):
-                        list_path = new_path + (idx,)
-                        if isinstance(item, str):
-                            yield GateLocation(container=value, key=idx, text=item, path=list_path)
-                        else:
-                            yield from iter_spanish_locations(item, list_path, new_context)
+    # explicit stack instead of nested generators; pending items are pushed in
+    # reverse so locations still come out in document order
+    stack: List[Any] = [(obj, path, context)]
+    while stack:
+        item = stack.pop()
+        if isinstance(item, GateLocation):
+            yield item
+            continue
+        node, node_path, node_context = item
+        pending: List[Any] = []
+        if isinstance(node, MutableMapping):
+            new_context = update_context(node_context, node)
+            for key, value in node.items():
+                new_path = node_path + (key,)
+                if isinstance(value, str):
+                    if should_gate_field(key, new_context):
+                        pending.append(GateLocation(container=node, key=key, text=value, path=new_path))
+                elif isinstance(value, MutableSequence):
+                    if should_gate_list(key, new_context):
+                        for idx, child in enumerate(value):
+                            list_path = new_path + (idx,)
+                            if isinstance(child, str):
+                                pending.append(GateLocation(container=value, key=idx, text=child, path=list_path))
+                            else:
+                                pending.append((child, list_path, new_context))
+                    else:
+                        for idx, child in enumerate(value):
+                            pending.append((child, new_path + (idx,), new_context))
+                elif isinstance(value, MutableMapping):
+                    pending.append((value, new_path, new_context))
+        elif isinstance(node, MutableSequence):
+            for idx, child in enumerate(node):
+                list_path = node_path + (idx,)
+                if isinstance(child, str):
+                    if node_context and node_context.get("list_spanish"):
+                        pending.append(GateLocation(container=node, key=idx, text=child, path=list_path))
                 else:
-                    for idx, item in enumerate(value):
-                        yield from iter_spanish_locations(item, new_path + (idx,), new_context)
-            elif isinstance(value, MutableMapping):
-                yield from iter_spanish_locations(value, new_path, new_context)
-    elif isinstance(obj, MutableSequence):
-        for idx, item in enumerate(obj):
-            list_path = path + (idx,)
-            if isinstance(item, str):
-                if context and context.get("list_spanish"):
-                    yield GateLocation(container=obj, key=idx, text=item, path=list_path)
-            else:
-                yield from iter_spanish_locations(item, list_path, context)
+                    pending.append((child, list_path, node_context))
+        stack.extend(reversed(pending))
 
 
 def tokenize(text: str) -> List[Tuple[str, int, int]]:
-    tokens: List[Tuple[str, int, int]] = []
-    idx = 0
-    length = len(text)
-    while idx < length:
-        char = text[idx]
-        if char.isspace():
-            idx += 1
-            continue
-        if char.isalnum() or char == "_":
-            start = idx
-            idx += 1
-            while idx < length and (text[idx].isalnum() or text[idx] == "_"):
-                idx += 1
-            tokens.append((text[start:idx], start, idx))
-        else:
-            start = idx
-            idx += 1
-            tokens.append((text[start:idx], start, idx))
-    return tokens
+    # runs of word characters, or any single non-space character
+    return [(match.group(), match.start(), match.end()) for match in _TOKEN_RE.finditer(text)]
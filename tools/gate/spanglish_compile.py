@@ -5,9 +5,10 @@ from __future__ import annotations
 
 import argparse
 import json
+import shutil
 import sys
 from pathlib import Path
-from typing import Dict, Iterable, Tuple
+from typing import AbstractSet, Dict, Iterable, Tuple
 
 try:
     from .common import (
@@ -15,6 +16,8 @@ try:
         DEFAULT_BANK_PATH,
         DEFAULT_FORMS_MAP_PATH,
         DEFAULT_KITS_PATH,
+        BankIndex,
+        first_bank_entry,
         load_always_allow,
         load_bank,
         load_forms_map,
@@ -23,6 +26,7 @@ try:
         load_progress,
         normalize_form,
         tokenize,
+        iter_lesson_files,
         iter_spanish_locations,
     )
 except ImportError:  # pragma: no cover - allow running as a script
@@ -32,6 +36,8 @@ except ImportError:  # pragma: no cover - allow running as a script
         DEFAULT_BANK_PATH,
         DEFAULT_FORMS_MAP_PATH,
         DEFAULT_KITS_PATH,
+        BankIndex,
+        first_bank_entry,
         load_always_allow,
         load_bank,
         load_forms_map,
@@ -40,6 +46,7 @@ except ImportError:  # pragma: no cover - allow running as a script
         load_progress,
         normalize_form,
         tokenize,
+        iter_lesson_files,
         iter_spanish_locations,
     )
 
@@ -59,8 +66,8 @@ def load_modes(config_dir: Path) -> Tuple[str, Dict[str, Dict[str, str]]]:
 def gate_text(
     text: str,
     *,
-    allowed_forms: set[str],
-    bank: Dict[str, list],
+    allowed_forms: AbstractSet[str],
+    bank: BankIndex,
     modes: Dict[str, Dict[str, str]],
     mode_key: str,
     forms_map: Dict[str, bool],
@@ -70,22 +77,31 @@ def gate_text(
     replacements = 0
     pieces = []
     last_index = 0
+    # tokens repeat heavily within a line; resolve each distinct token once
+    seen: Dict[str, str] = {}
     for token, start, end in tokenize(text):
+        replacement = seen.get(token)
+        if replacement is None:
+            replacement = token
+            normalized = normalize_form(token, forms_map)
+            if normalized and normalized not in allowed_forms:
+                entry = first_bank_entry(bank, normalized)
+                if entry:
+                    english = entry.english.strip() or entry.lemma or entry.form
+                    try:
+                        replacement = fmt.format(form=token, english=english, lemma=entry.lemma or entry.form)
+                    except KeyError:
+                        replacement = english
+            seen[token] = replacement
+        if replacement == token:
+            continue
+        # only slice the text around tokens that actually change
         pieces.append(text[last_index:start])
-        normalized = normalize_form(token, forms_map)
-        replacement = token
-        if normalized and normalized not in allowed_forms:
-            entries = bank.get(normalized)
-            if entries:
-                entry = entries[0]
-                english = entry.english.strip() or entry.lemma or entry.form
-                try:
-                    replacement = fmt.format(form=token, english=english, lemma=entry.lemma or entry.form)
-                except KeyError:
-                    replacement = english
-                replacements += int(replacement != token)
         pieces.append(replacement)
         last_index = end
+        replacements += 1
+    if not replacements:
+        return text, 0
     pieces.append(text[last_index:])
     return "".join(pieces), replacements
 
@@ -93,8 +109,8 @@ def gate_text(
 def compile_lesson(
     lesson: object,
     *,
-    allowed_forms: set[str],
-    bank: Dict[str, list],
+    allowed_forms: AbstractSet[str],
+    bank: BankIndex,
     modes: Dict[str, Dict[str, str]],
     mode_key: str,
     forms_map: Dict[str, bool],
@@ -148,10 +164,9 @@ def main(argv: Iterable[str] | None = None) -> int:
     bank = load_bank(args.bank, forms_map)
     kits = load_kits(args.kits, forms_map)
     _, always_allow_norm = load_always_allow(args.always_allow, forms_map)
-    allowed_forms = load_progress(args.step, kits, forms_map)
-    allowed_forms.update(always_allow_norm)
+    allowed_forms = frozenset(load_progress(args.step, kits, forms_map) | always_allow_norm)
 
-    lesson_files = sorted([p for p in scan_dir.rglob("*.json") if p.is_file()])
+    lesson_files = list(iter_lesson_files(scan_dir))
     if not lesson_files:
         print(f"[gate] No lesson JSON files found under {scan_dir}", file=sys.stderr)
         return 0
@@ -172,8 +187,15 @@ def main(argv: Iterable[str] | None = None) -> int:
         rel_path = src_path.relative_to(scan_dir)
         dest_path = out_dir / rel_path
         dest_path.parent.mkdir(parents=True, exist_ok=True)
-        with open(dest_path, "w", encoding="utf-8") as handle:
-            json.dump(lesson_data, handle, ensure_ascii=False, indent=2)
+        if replacements:
+            with open(dest_path, "w", encoding="utf-8") as handle:
+                json.dump(lesson_data, handle, ensure_ascii=False, indent=2)
+        else:
+            # nothing was gated; ship the source bytes without re-encoding
+            try:
+                shutil.copyfile(src_path, dest_path)
+            except shutil.SameFileError:
+                pass  # compiling in place (--out == --scan); already up to date
         total_files += 1
         total_replacements += replacements
     print(f"[gate] Compiled {total_files} lessons with {total_replacements} replacements using mode '{mode_key}'.")
@@ -1,8 +1,8 @@
 #!/usr/bin/env python3
-import argparse, re, json, sys
+import argparse, json, sys
 from pathlib import Path
 
-CONFLICT_RE = re.compile(r'^<<<<<<<|^=======|^>>>>>>>', re.M)
+CONFLICT_PREFIXES = (b'<<<<<<<', b'=======', b'>>>>>>>')
 
 def scan_conflict_markers(root: Path):
     hits = []
@@ -10,12 +10,12 @@ def scan_conflict_markers(root: Path):
         if not p.is_file():
             continue
         try:
-            text = p.read_text(encoding='utf-8', errors='ignore')
+            with open(p, 'rb') as fh:
+                for line_no, line in enumerate(fh, 1):
+                    if line.startswith(CONFLICT_PREFIXES):
+                        hits.append((str(p), line_no, line[:7].decode()))
         except Exception:
             continue
-        for m in CONFLICT_RE.finditer(text):
-            line = text.count('\n', 0, m.start()) + 1
-            hits.append((str(p), line, m.group(0).strip()))
     return hits
 
 if __name__ == '__main__':